@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 # Ash Light - A terminal dungeon crawler
 
+import atexit
 import os
-import random
+import select
 import sys
 import termios
 import tty
 import time
 import signal
+import numpy as np
 from rich.console import Console
+from rich.control import Control
 from rich.text import Text
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; without it the NumPy painter is used
+    njit = None
+
 # Map constants
 WIDTH = 54
 HEIGHT = 15
 VISION_RADIUS = 3
 TORCH_RADIUS = 3
 TORCH_COUNT = 3
+KEY_COUNT = 3
+VICTORY_PAUSE = 2  # Seconds to hold the victory message; 0 skips it (e.g. for benchmarks)
+FLICKER_INTERVAL = 0.15  # Seconds between flicker frames while the player carries a light
 
 WALL = '#'
 FLOOR = '.'
@@ -26,6 +37,18 @@ EXIT = 'E'
 TORCH = '!'
 FOG = ' '
 
+# Tile codes stored in the map array, and the glyph drawn for each.
+# FOG_CODE never appears in the map; render uses it for unseen cells.
+FLOOR_CODE = 0
+WALL_CODE = 1
+FOG_CODE = 2
+GLYPH_TABLE = np.array((FLOOR, WALL, FOG), dtype=object)
+
+# Lit tile style for each (tile code, brightness); other tiles fall back to white
+_BRIGHTNESS_STYLES = ("grey50", "red3", "dark_red", "bold red")
+STYLE_LUT = {(code, b): _BRIGHTNESS_STYLES[b]
+             for code in (WALL_CODE, FLOOR_CODE) for b in range(len(_BRIGHTNESS_STYLES))}
+
 # Arrow key escape sequences
 UP = '\x1b[A'
 DOWN = '\x1b[B'
@@ -40,21 +63,91 @@ DIRS = {
     RIGHT: (0, 1),
 }
 
+# Home the cursor and clear the screen; Windows consoles fall back to cls
+_CLEAR = "\x1b[H\x1b[2J" if os.name != "nt" else None
+
 console = Console()
 
+
+def disk_kernel(r):
+    """Return the (intensity, mask) pair for a Manhattan disk of radius r in a (2r+1)^2 square."""
+    offsets = np.abs(np.arange(-r, r + 1))
+    dist = offsets[:, None] + offsets[None, :]
+    return np.maximum(0, r - dist).astype(np.int8), dist <= r
+
+
+TORCH_KERNEL, TORCH_MASK = disk_kernel(TORCH_RADIUS)
+VISION_KERNEL, VISION_MASK = disk_kernel(VISION_RADIUS)
+
+
+def _paint_disk_loop(ll, vis, seen, cy, cx, kernel, mask, flicker, noise):
+    # Plain loops over the in-bounds part of the kernel square, meant to be
+    # compiled by numba. noise holds one uniform draw per kernel cell.
+    r = kernel.shape[0] // 2
+    h, w = ll.shape
+    y0, y1 = max(0, cy - r), min(h, cy + r + 1)
+    x0, x1 = max(0, cx - r), min(w, cx + r + 1)
+    for ny in range(y0, y1):
+        ky = ny - cy + r
+        for nx in range(x0, x1):
+            kx = nx - cx + r
+            if mask[ky, kx]:
+                intensity = kernel[ky, kx]
+                if flicker and noise[ky, kx] < 0.2 and intensity > 0:
+                    intensity -= 1
+                if intensity > ll[ny, nx]:
+                    ll[ny, nx] = intensity
+                vis[ny, nx] = True
+                seen[ny, nx] = True
+
+
+def _paint_disk_numpy(ll, vis, seen, cy, cx, kernel, mask, flicker, noise):
+    # Crop the map and kernel to the same in-bounds rectangle once, then
+    # paint it with whole-slice operations
+    r = kernel.shape[0] // 2
+    h, w = ll.shape
+    y0, y1 = max(0, cy - r), min(h, cy + r + 1)
+    x0, x1 = max(0, cx - r), min(w, cx + r + 1)
+    ky0, kx0 = y0 - (cy - r), x0 - (cx - r)
+    ks = (slice(ky0, ky0 + (y1 - y0)), slice(kx0, kx0 + (x1 - x0)))
+    k, m = kernel[ks], mask[ks]
+    if flicker:
+        k = np.where((noise[ks] < 0.2) & (k > 0), k - 1, k)
+    lit = ll[y0:y1, x0:x1]
+    np.maximum(lit, k, out=lit)
+    vis[y0:y1, x0:x1] |= m
+    seen[y0:y1, x0:x1] |= m
+
+
+paint_disk = _paint_disk_numpy
+if njit is not None:
+    try:
+        paint_disk = njit(cache=True)(_paint_disk_loop)
+    except RuntimeError:
+        # Frozen builds (e.g. PyInstaller) ship no .py source, so numba has
+        # nowhere to cache the compiled function; keep the NumPy painter
+        njit = None
+
+
 class Game:
     def __init__(self):
+        self._rng = np.random.default_rng()
         self.map = self.generate_map()
-        self.visible = [[False] * WIDTH for _ in range(HEIGHT)]
-        self.light_levels = [[0] * WIDTH for _ in range(HEIGHT)]
-        self.seen = [[False] * WIDTH for _ in range(HEIGHT)]
-        self.torches = [(None, None)]  # Placeholder to simulate starting with player light
+        self.visible = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        self.light_levels = np.zeros((HEIGHT, WIDTH), dtype=np.int8)
+        self.seen = np.zeros_like(self.visible)
+        # Torches never move, so their light is splatted once into these grids
+        self._static_light = np.zeros((HEIGHT, WIDTH), dtype=np.int8)
+        self._static_seen = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        self.torches = set()
+        self._player_light_active = True  # The player carries a light until the last torch is dropped
         self.torch_count = TORCH_COUNT
-        self.player_pos = None
-        self.treasure_pos = None
-        self.exit_pos = None
+        # Shuffled floor tiles; random_empty hands them out without replacement
+        self._free = np.argwhere(self.map == FLOOR_CODE)
+        self._rng.shuffle(self._free)
+        self._free_idx = 0
         self.player_pos = self.random_empty()
-        self.treasure_pos = [self.random_empty() for _ in range(3)]
+        self.treasure_pos = [self.random_empty() for _ in range(KEY_COUNT)]
         self.collected_treasures = set()
         self.exit_pos = self.random_empty()
         self.has_treasure = False
@@ -62,159 +155,242 @@ class Game:
         self.message_style = "white"  # Style for the current message
         self.running = True  # Flag to control the game loop
         self.old_termios = None
+        self._input = ''  # Bytes read from the terminal but not yet handed out as keys
+        if sys.stdin.isatty():
+            # Switch to cbreak mode once for the whole game and restore it on exit
+            fd = sys.stdin.fileno()
+            self.old_termios = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+            atexit.register(termios.tcsetattr, fd, termios.TCSADRAIN, self.old_termios)
+        # Last frame drawn, so render only has to emit the cells that changed
+        self._prev_glyph = np.full((HEIGHT, WIDTH), None, dtype=object)
+        self._prev_style = np.full((HEIGHT, WIDTH), None, dtype=object)
+        self._prev_status = None
+        self._needs_clear = True
+        self._ansi_cache = {}
+        self._dirty = True  # Game state changed since the last frame was drawn
+        # Status chrome is fixed text, so its markup is rendered to ANSI only once
+        self._treasure_line = self.styled("[bold green]You have the treasure! Find the exit![/bold green]")
+        self._controls_line = self.styled("[dim]Controls: [↑↓←→] move  [A] drop torch  [Ctrl+C] quit[/dim]")
+        self._legend_line = self.styled("[dim]Legend: [bold yellow]@[/bold yellow] you  [bold red]![/bold red] torch  [bold magenta]K[/bold magenta] key  [bold cyan]E[/bold cyan] exit[/dim]")
+        if njit is not None:
+            # Compile the painter now so the first keypress doesn't pay for it
+            scratch = np.zeros((1, 1), dtype=bool)
+            kernel, mask = disk_kernel(1)
+            paint_disk(np.zeros((1, 1), dtype=np.int8), scratch, scratch.copy(),
+                       0, 0, kernel, mask, True, np.zeros((3, 3)))
 
     def generate_map(self):
-        grid = [[FLOOR for _ in range(WIDTH)] for _ in range(HEIGHT)]
-        for y in range(HEIGHT):
-            for x in range(WIDTH):
-                if x == 0 or x == WIDTH - 1 or y == 0 or y == HEIGHT - 1:
-                    grid[y][x] = WALL
-                elif random.random() < 0.1:
-                    grid[y][x] = WALL
+        grid = np.full((HEIGHT, WIDTH), FLOOR_CODE, dtype=np.uint8)
+        grid[0, :] = grid[-1, :] = grid[:, 0] = grid[:, -1] = WALL_CODE
+        interior = self._rng.random((HEIGHT - 2, WIDTH - 2)) < 0.1
+        grid[1:-1, 1:-1][interior] = WALL_CODE
         return grid
 
     def random_empty(self):
-        while True:
-            y = random.randint(1, HEIGHT - 2)
-            x = random.randint(1, WIDTH - 2)
-            occupied = [pos for pos in [self.player_pos, self.treasure_pos, self.exit_pos] if pos is not None]
-            if self.map[y][x] == FLOOR and (y, x) not in occupied:
-                return (y, x)
+        y, x = self._free[self._free_idx]
+        self._free_idx += 1
+        return (int(y), int(x))
 
-    def in_bounds(self, y, x):
-        return 0 <= y < HEIGHT and 0 <= x < WIDTH
+    def splat_torch(self, pos):
+        cy, cx = pos
+        _paint_disk_numpy(self._static_light, self._static_seen, self.seen,
+                          cy, cx, TORCH_KERNEL, TORCH_MASK, False, None)
 
     def update_visibility(self):
-        self.visible = [[False] * WIDTH for _ in range(HEIGHT)]
-        self.light_levels = [[0] * WIDTH for _ in range(HEIGHT)]
-
-        def light_radius(center, radius, flicker=False):
-            for dy in range(-radius, radius + 1):
-                for dx in range(-radius, radius + 1):
-                    ny, nx = center[0] + dy, center[1] + dx
-                    if self.in_bounds(ny, nx):
-                        dist = abs(dy) + abs(dx)
-                        if dist <= radius:
-                            self.visible[ny][nx] = True
-                            self.seen[ny][nx] = True
-                            intensity = max(0, radius - dist)
-                            if flicker and random.random() < 0.2:
-                                intensity = max(0, intensity - 1)
-                            self.light_levels[ny][nx] = max(self.light_levels[ny][nx], intensity)
-
-        for t in self.torches:
-            if t == (None, None):  # Player's own light
-                if self.torch_count > 0:
-                    light_radius(self.player_pos, VISION_RADIUS, flicker=True)
-            else:
-                light_radius(t, TORCH_RADIUS, flicker=True)
+        # Start from the cached torch light; only the player's light moves
+        np.copyto(self.light_levels, self._static_light)
+        np.copyto(self.visible, self._static_seen)
+
+        if self._player_light_active:
+            cy, cx = self.player_pos
+            # One batched draw covers the flicker roll for every cell of the disk
+            noise = self._rng.random((2 * VISION_RADIUS + 1, 2 * VISION_RADIUS + 1))
+            paint_disk(self.light_levels, self.visible, self.seen,
+                       cy, cx, VISION_KERNEL, VISION_MASK, True, noise)
 
     def get_tile_style(self, y, x):
-        brightness = self.light_levels[y][x]
+        brightness = self.light_levels[y, x]
         if brightness == 0:
             return "dim"
-        elif self.map[y][x] == WALL:
-            return ["grey50", "red3", "dark_red", "bold red"][brightness]
-        elif self.map[y][x] == FLOOR:
-            return ["grey50", "red3", "dark_red", "bold red"][brightness]
+        return STYLE_LUT.get((self.map[y, x], brightness), "white")
+
+    def styled(self, text, style=None):
+        """Return text as the ANSI string Rich would print, cached per (text, style)."""
+        key = (text, style)
+        ansi = self._ansi_cache.get(key)
+        if ansi is None:
+            with console.capture() as capture:
+                console.print(text, style=style, end="", soft_wrap=True)
+            ansi = self._ansi_cache[key] = capture.get()
+        return ansi
+
+    @staticmethod
+    def changed_spans(changed):
+        """Yield (y, x0, x1) for each horizontal run of changed cells."""
+        for y in range(changed.shape[0]):
+            xs = np.flatnonzero(changed[y])
+            if len(xs) == 0:
+                continue
+            # Split wherever consecutive changed columns are not adjacent
+            breaks = np.flatnonzero(np.diff(xs) > 1)
+            starts = np.concatenate(([xs[0]], xs[breaks + 1]))
+            ends = np.concatenate((xs[breaks], [xs[-1]])) + 1
+            for x0, x1 in zip(starts, ends):
+                yield y, int(x0), int(x1)
+
+    def clear_screen(self):
+        if _CLEAR:
+            sys.stdout.write(_CLEAR)
         else:
-            return "white"
+            os.system('cls')
 
-    def render(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+    def animate(self):
+        """Re-roll the player's light flicker, redrawing only if any cell changed."""
+        before = self.light_levels.copy()
         self.update_visibility()
-        for y in range(HEIGHT):
-            row = Text()
-            for x in range(WIDTH):
-                # Always show the player if they're at this position
-                if (y, x) == self.player_pos:
-                    row.append(PLAYER, style="bold yellow")
-                # If tile is currently visible due to torch or player light
-                elif self.visible[y][x]:
-                    style = self.get_tile_style(y, x)
-                    if (y, x) in self.treasure_pos and (y, x) not in self.collected_treasures:
-                        row.append(TREASURE, style="bold magenta")
-                    elif (y, x) == self.exit_pos:
-                        row.append(EXIT, style="bold cyan")
-                    elif (y, x) in self.torches:
-                        row.append(TORCH, style="bold red")
-                    else:
-                        tile = self.map[y][x]
-                        row.append(tile, style=style)
-                # If tile has been seen before, draw it in dim memory
-                elif self.seen[y][x]:
-                    tile = self.map[y][x]
-                    if tile == WALL or tile == FLOOR:
-                        row.append(tile, style="grey23")
-                    else:
-                        row.append(FOG, style="dim")
-                # Tile has never been seen
-                else:
-                    row.append(FOG, style="dim")
-            console.print(row)
-        console.print(f"[bold]Torches left:[/bold] {self.torch_count}")
-        
+        if not np.array_equal(before, self.light_levels):
+            self.render()
+
+    def render(self):
+        out = []
+        if self._needs_clear:
+            # Full repaint: wipe the screen and forget what was drawn before
+            self.clear_screen()
+            self._prev_glyph.fill(None)
+            self._prev_style.fill(None)
+            self._prev_status = None
+            self._needs_clear = False
+
+        # Seen-but-not-lit tiles come from the dim memory layer, everything else is fog
+        memory = self.seen & ~self.visible
+        remembered = memory & ((self.map == WALL_CODE) | (self.map == FLOOR_CODE))
+        glyphs = GLYPH_TABLE[np.where(remembered, self.map, FOG_CODE)]
+        styles = np.where(remembered, "grey23", "dim").astype(object)
+
+        # Lit tiles still need per-cell decisions
+        for y, x in np.argwhere(self.visible).tolist():
+            if (y, x) in self.treasure_pos and (y, x) not in self.collected_treasures:
+                glyphs[y, x], styles[y, x] = TREASURE, "bold magenta"
+            elif (y, x) == self.exit_pos:
+                glyphs[y, x], styles[y, x] = EXIT, "bold cyan"
+            elif (y, x) in self.torches:
+                glyphs[y, x], styles[y, x] = TORCH, "bold red"
+            else:
+                glyphs[y, x] = GLYPH_TABLE[self.map[y, x]]
+                styles[y, x] = self.get_tile_style(y, x)
+        # Always show the player, lit or not
+        glyphs[self.player_pos], styles[self.player_pos] = PLAYER, "bold yellow"
+
+        # Only cells whose glyph or style changed since the last frame are redrawn
+        changed = (glyphs != self._prev_glyph) | (styles != self._prev_style)
+        with console.capture() as capture:
+            for y, x0, x1 in self.changed_spans(changed):
+                # One Text per span of changed cells, with one segment per style run
+                segments = []
+                buf, run_style = '', styles[y, x0]
+                for x in range(x0, x1):
+                    if styles[y, x] != run_style:
+                        segments.append((buf, run_style))
+                        buf, run_style = '', styles[y, x]
+                    buf += glyphs[y, x]
+                segments.append((buf, run_style))
+                console.control(Control.move_to(x0, y))
+                console.print(Text.assemble(*segments), end="", soft_wrap=True)
+        out.append(capture.get())
+        self._prev_glyph = glyphs
+        self._prev_style = styles
+
+        status = [self.styled(f"[bold]Torches left:[/bold] {self.torch_count}")]
         # Display game messages in a consistent location
         if self.message:
-            console.print(f"[{self.message_style}]{self.message}[/{self.message_style}]")
+            status.append(self.styled(f"[{self.message_style}]{self.message}[/{self.message_style}]"))
         elif self.has_treasure:
-            console.print("[bold green]You have the treasure! Find the exit![/bold green]")
-
+            status.append(self._treasure_line)
+        else:
+            status.append("")
         # Add controls and legend
-        console.print("[dim]Controls: [↑↓←→] move  [A] drop torch  [Ctrl+C] quit[/dim]")
-        console.print("[dim]Legend: [bold yellow]@[/bold yellow] you  [bold red]![/bold red] torch  [bold magenta]K[/bold magenta] key  [bold cyan]E[/bold cyan] exit[/dim]")
+        status.append(self._controls_line)
+        status.append(self._legend_line)
+        if status != self._prev_status:
+            for i, line in enumerate(status):
+                out.append(f"\x1b[{HEIGHT + i + 1};1H")
+                out.append(line)
+                out.append("\x1b[K")
+            self._prev_status = status
+
+        # Park the cursor below the status lines
+        out.append(f"\x1b[{HEIGHT + len(status) + 1};1H")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
 
     def move(self, dy, dx):
         ny, nx = self.player_pos[0] + dy, self.player_pos[1] + dx
-        if self.in_bounds(ny, nx) and self.map[ny][nx] != WALL:
-            old_pos = self.player_pos
+        if 0 <= ny < HEIGHT and 0 <= nx < WIDTH and self.map[ny, nx] != WALL_CODE:
             self.player_pos = (ny, nx)
+            self._dirty = True
             
             # Handle key collection
             if self.player_pos in self.treasure_pos and self.player_pos not in self.collected_treasures:
                 self.collected_treasures.add(self.player_pos)
-                self.set_message(f"You found a key! ({len(self.collected_treasures)}/3)", "bold magenta")
-                if len(self.collected_treasures) == 2:
+                self.set_message(f"You found a key! ({len(self.collected_treasures)}/{KEY_COUNT})", "bold magenta")
+                if len(self.collected_treasures) == KEY_COUNT - 1:
                     self.set_message("You hear a distant wail... Something ancient has stirred.")
                     time.sleep(3)
                     self.set_message("The dead do not rest easy in this place. And now, they know you're here.", "bold red")
-                if len(self.collected_treasures) == 3:
+                if len(self.collected_treasures) == KEY_COUNT:
                     self.has_treasure = True
-                    self.set_message("You have all three keys! The exit is now your only hope.", "bold green")
+                    self.set_message("You have all the keys! The exit is now your only hope.", "bold green")
             
             # Handle exit with treasure
             elif self.player_pos == self.exit_pos and self.has_treasure:
                 self.set_message("You escaped with the treasure! Victory!", "bold green")
-                time.sleep(2)  # Give player time to see the victory message
+                if VICTORY_PAUSE:
+                    time.sleep(VICTORY_PAUSE)  # Give player time to see the victory message
                 sys.exit(0)
 
     def place_torch(self):
         if self.torch_count > 0 and self.player_pos not in self.torches:
-            self.torches.append(self.player_pos)
+            self.torches.add(self.player_pos)
+            self.splat_torch(self.player_pos)
             self.torch_count -= 1
+            self._dirty = True
             if self.torch_count == 0:
-                self.torches = [t for t in self.torches if t != (None, None)]
+                self._player_light_active = False
 
-    def getch(self):
+    def getch(self, timeout=None):
+        """Return the next key, or None if timeout seconds pass without input."""
         fd = sys.stdin.fileno()
-        self.old_termios = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':  # Arrow key prefix
-                ch += sys.stdin.read(2)  # Read the rest of the arrow key sequence
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, self.old_termios)
+        if not self._input:
+            if not select.select([fd], [], [], timeout)[0]:
+                return None
+            data = os.read(fd, 8)
+            if not data:
+                raise EOFError
+            self._input = data.decode(errors='ignore')
+        # An escape sequence may be cut at a read boundary, including one left over
+        # from the previous read: give the rest of it a moment to arrive
+        while self._input.startswith('\x1b') and len(self._input) < 3:
+            if not select.select([fd], [], [], 0.002)[0]:
+                break
+            data = os.read(fd, 8)
+            if not data:
+                break
+            self._input += data.decode(errors='ignore')
+        # Arrow keys are three-character CSI sequences, everything else is one character
+        n = 3 if self._input.startswith('\x1b[') and len(self._input) >= 3 else 1
+        ch, self._input = self._input[:n], self._input[n:]
         return ch
 
     def title_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.clear_screen()
+        self._needs_clear = True
         console.print("[bold bright_white]Ash Light[/bold bright_white]", justify="center")
         console.print("", justify="center")
         console.print("[dim italic]The fire is fading...[/dim italic]", justify="center")
         console.print("[dim italic]You descend with only a few embers in hand.[/dim italic]", justify="center")
         console.print("[dim italic]Each light you leave behind is one step closer to the dark.[/dim italic]", justify="center")
-        console.print("[dim italic]Three ghost-guarded keys must be found to unlock the way out.[/dim italic]", justify="center")
+        console.print("[dim italic]The ghost-guarded keys must all be found to unlock the way out.[/dim italic]", justify="center")
         console.print("", justify="center")
         console.print("[bold][Press 'B' to Begin][/bold]", justify="center")
         while True:
@@ -222,17 +398,12 @@ class Game:
             if key == ' ':
                 break
 
-    def checkEnter(self, cmd):
-        return ord(cmd) in (10, 13)
-
     def set_message(self, text, style="white"):
         self.message = text
         self.message_style = style
 
     def handle_sigint(self, signum, frame):
-        # Restore terminal settings before exiting
-        fd = sys.stdin.fileno()
-        termios.tcsetattr(fd, termios.TCSADRAIN, self.old_termios)
+        # Terminal settings are restored by the atexit hook
         console.print("\n[bold red]Game Over![/bold red]")
         sys.exit(0)  # Immediately exit the program
 
@@ -243,14 +414,20 @@ def main():
     
     try:
         while game.running:
-            game.render()
-            cmd = game.getch()
-            
-            if cmd in DIRS:
+            if game._dirty:
+                game.update_visibility()
+                game.render()
+                game._dirty = False
+            # Only wake up for flicker frames while there is a moving light to animate
+            cmd = game.getch(FLICKER_INTERVAL if game._player_light_active else None)
+
+            if cmd is None:
+                game.animate()
+            elif cmd in DIRS:
                 game.move(*DIRS[cmd])
-            elif game.checkEnter(cmd):
+            elif cmd in ('\r', '\n'):
                 game.place_torch()
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, EOFError):
         console.print("\n[bold red]Game Over![/bold red]")
     finally:
         # Clean up terminal state